@@ -0,0 +1,29 @@
+"""Paths, YAML bindings and command templates shared by the tools/ scripts."""
+from pathlib import Path
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper  # libyaml bindings, much faster
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "docs" / "_data"
+TASKS_DIR = DATA_DIR / "tasks"
+# JSON mirror of TASKS_DIR, written by yaml_to_json.py. Kept outside tasks/
+# (and dot-prefixed) so Jekyll does not load it as site data.
+TASKS_JSON_DIR = DATA_DIR / ".tasks_json"
+
+# Default docker.commands of a task; {id}/{*_image} and <WORKLOAD_PY> are filled in by bench.render
+RUN_BASE = (
+    "docker run --rm --name bench_{id}_base "
+    "--mount type=bind,src=<WORKLOAD_PY>,dst=/tmp/workload.py "
+    "{base_image} /bin/bash -lc 'python /tmp/workload.py'"
+)
+# Order matters: chmod -> git apply -> /perf.sh
+RUN_HUMAN = (
+    "docker run --rm --platform linux/amd64 --name bench_{id}_human "
+    "--mount type=bind,src=<WORKLOAD_PY>,dst=/tmp/workload.py "
+    "{human_image} /bin/bash -lc "
+    "'chmod +x /perf.sh && git apply /tmp/patch.diff && /perf.sh'"
+)
+RUN_LLM = "echo 'LLM image not available yet for {id}. Please fill docker.llm_image.'"
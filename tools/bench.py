@@ -1,86 +1,333 @@
 #!/usr/bin/env python3
-import argparse, json, re, subprocess, time, tempfile
+import argparse, asyncio, atexit, hashlib, json, math, os, pickle, re, shlex, shutil, subprocess, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
 import yaml
+from rich.markup import escape
 from rich.progress import Progress
 
-ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / "docs" / "_data"
-TASKS_DIR = DATA_DIR / "tasks"
+try:
+    import orjson  # optional, much faster results.json (de)serialization
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan  # optional, single-pass scan for the Mean/Std labels
+except ImportError:
+    hyperscan = None
+
+from _bench_common import DATA_DIR, TASKS_DIR, TASKS_JSON_DIR, RUN_BASE, RUN_HUMAN, SafeLoader
+
 RESULTS_PATH = DATA_DIR / "results.json"
+TASKS_CACHE_PATH = DATA_DIR / ".tasks_cache.pkl"
+VARIANT_CACHE_PATH = DATA_DIR / ".variant_cache.json"
 
 # -------- Parsing helpers --------
 # Float like 0.123, 1, .5, 1e-3, -2.5E+06
 FLOAT = r"([+-]?(?:\d+\.\d+|\d+|\.\d+)(?:[eE][+-]?\d+)?)"
 
 # Mean label could be "Mean", "After Mean", "Average", "Avg"
-RE_MEAN = re.compile(rf"(?i)\b(?:after\s+)?(?:mean|average|avg)\b\s*[:=]\s*{FLOAT}")
+LABEL_MEAN = r"\b(?:after\s+)?(?:mean|average|avg)\b\s*[:=]"
 # Std label could be "Std", "Std Dev", "SD", "StdDev", "Std Deviation"
-RE_STD  = re.compile(rf"(?i)\b(?:std(?:\.|\s*dev)?|sd|stddev|std\s*deviation)\b\s*[:=]\s*{FLOAT}")
+LABEL_STD = r"\b(?:std(?:\.|\s*dev)?|sd|stddev|std\s*deviation)\b\s*[:=]"
+
+RE_MEAN = re.compile(rf"(?i){LABEL_MEAN}\s*{FLOAT}")
+RE_STD  = re.compile(rf"(?i){LABEL_STD}\s*{FLOAT}")
 
 # PERF block: prefer the LAST PERF_START..PERF_END block if present
+PERF_START, PERF_END = "PERF_START:", "PERF_END:"
 RE_PERF_BLOCK = re.compile(r"(?is)PERF_START:\s*(.*?)\s*PERF_END:")
 
 def extract_scope(text: str) -> str:
     if not text:
         return ""
+    # Fast path: markers as emitted by the workloads, located with rfind
+    end = text.rfind(PERF_END)
+    if end != -1:
+        start = text.rfind(PERF_START, 0, end)
+        if start != -1:
+            return text[start + len(PERF_START):end].strip()
+    # Odd-cased markers only; skip the DOTALL scan when there is no marker at all
+    if "perf_end" not in text.lower():
+        return text
     blocks = RE_PERF_BLOCK.findall(text)
     if blocks:
         return blocks[-1]
     return text
 
-def parse_mean_std(text: str):
-    scope = extract_scope(text)
-    means = RE_MEAN.findall(scope)
-    stds  = RE_STD.findall(scope)
-    if not means or not stds:
-        # fallback to whole text
-        means = RE_MEAN.findall(text or "")
-        stds  = RE_STD.findall(text or "")
-    if not means or not stds:
+# Same labels as RE_MEAN / RE_STD, for the plain-string scanner below
+MEAN_LABELS = ("mean", "average", "avg")
+STD_LABELS = ("std", "std dev", "stddev", "sd", "std deviation", "stddeviation")
+LABEL_HINTS = ("mean", "average", "avg", "std", "sd")
+
+def _has_label(label: str, names) -> bool:
+    # label ends with one of `names`, starting on a word boundary
+    for n in names:
+        if label.endswith(n):
+            i = len(label) - len(n)
+            if i == 0 or not (label[i - 1].isalnum() or label[i - 1] == "_"):
+                return True
+    return False
+
+RE_FLOAT_TOKEN = re.compile(FLOAT)
+
+def _plain_float(tok: str):
+    # Exactly what FLOAT accepts; float() alone would also take "1.e5", "nan", "1_0"
+    if not RE_FLOAT_TOKEN.fullmatch(tok):
+        return None
+    return float(tok)
+
+def scan_mean_std(text: str):
+    """
+    Last "<label>: <number>" Mean/Std values in `text`, found with a reverse line
+    scan and plain string operations. Returns (None, None) unless both are found
+    on unambiguous lines; callers then fall back to the regexes.
+    """
+    mean = std = None
+    for line in reversed(text.splitlines()):
+        lower = line.lower()
+        if not any(h in lower for h in LABEL_HINTS):
+            continue
+        seps = lower.count(":") + lower.count("=")
+        if seps == 0:
+            continue
+        if seps > 1:
+            return None, None  # e.g. "Mean: 1 Std: 2" on one line
+        label, _, rest = lower.replace("=", ":").partition(":")
+        label = " ".join(label.split())
+        is_mean = mean is None and _has_label(label, MEAN_LABELS)
+        is_std = std is None and _has_label(label, STD_LABELS)
+        if not (is_mean or is_std):
+            continue
+        toks = rest.split()
+        value = _plain_float(toks[0]) if toks else None
+        if value is None:
+            return None, None
+        if is_mean:
+            mean = value
+        else:
+            std = value
+        if mean is not None and std is not None:
+            return mean, std
+    return None, None
+
+# Hyperscan reports only match end offsets, so the database holds the labels and
+# the number right after the last label is read with an anchored regex match.
+HS_MEAN, HS_STD = 0, 1
+RE_FLOAT_AT = re.compile(rb"\s*" + FLOAT.encode())
+
+def _compile_label_db():
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[LABEL_MEAN.encode(), LABEL_STD.encode()],
+            ids=[HS_MEAN, HS_STD],
+            elements=2,
+            flags=[hyperscan.HS_FLAG_CASELESS] * 2,
+        )
+        return db
+    except Exception:
+        return None
+
+HS_LABEL_DB = _compile_label_db()
+
+def hs_mean_std(text: str):
+    """
+    Last Mean/Std values in `text` from a single Hyperscan pass over both label
+    patterns. Hyperscan's \\b / \\s are ASCII-only, so this gives the same result
+    as the RE_MEAN/RE_STD last matches only for ASCII text.
+    """
+    data = text.encode("utf-8")
+    ends = ([], [])
+
+    def on_match(id, start, end, flags, context):
+        ends[id].append(end)
+
+    HS_LABEL_DB.scan(data, match_event_handler=on_match)
+    values = []
+    for offsets in ends:
+        # a label without a number after it does not count, as with the regexes
+        value = None
+        for end in reversed(offsets):
+            m = RE_FLOAT_AT.match(data, end)
+            if m:
+                value = float(m.group(1))
+                break
+        if value is None:
+            return None, None
+        values.append(value)
+    return values[0], values[1]
+
+def last_match(regex, text: str):
+    """Group 1 of the last match of `regex` in `text`, or None."""
+    m = None
+    for m in regex.finditer(text):
+        pass
+    return m.group(1) if m else None
+
+def _mean_std(text: str):
+    mean, std = scan_mean_std(text)
+    if mean is not None:
+        return mean, std
+    if HS_LABEL_DB is not None and text.isascii():
+        return hs_mean_std(text)  # same answer as the regexes below, in one pass
+    mean, std = last_match(RE_MEAN, text), last_match(RE_STD, text)
+    if mean is None or std is None:
         return None, None
     try:
-        return float(means[-1]), float(stds[-1])
+        return float(mean), float(std)
     except Exception:
         return None, None
 
+def parse_mean_std(text: str):
+    scope = extract_scope(text)
+    mean, std = _mean_std(scope)
+    if mean is None and scope is not text:
+        # fallback to whole text
+        mean, std = _mean_std(text or "")
+    return mean, std
+
 # -------- IO helpers --------
+def load_task_json(yml_path, yml_mtime_ns):
+    # JSON mirror of a task file, used only when at least as new as the YAML
+    jp = TASKS_JSON_DIR / f"{yml_path.stem}.json"
+    try:
+        if jp.stat().st_mtime_ns < yml_mtime_ns:
+            return None
+        with open(jp, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
 def load_tasks():
+    # Parsed tasks are cached on disk, keyed by the name + mtime of every task file
+    paths = sorted(TASKS_DIR.glob("*.yml"))
+    mtime_sig = tuple((p.name, p.stat().st_mtime_ns) for p in paths)
+    try:
+        with open(TASKS_CACHE_PATH, "rb") as f:
+            cached_sig, cached_tasks = pickle.load(f)
+        if cached_sig == mtime_sig:
+            return cached_tasks
+    except Exception:
+        pass
+
     tasks = []
-    for p in sorted(TASKS_DIR.glob("*.yml")):
-        with open(p, "r", encoding="utf-8") as f:
-            d = yaml.safe_load(f)
-            if not d:
-                continue
-            tasks.append(d)
+    for p, (_, mtime_ns) in zip(paths, mtime_sig):
+        d = load_task_json(p, mtime_ns)
+        if d is None:
+            with open(p, "r", encoding="utf-8") as f:
+                d = yaml.load(f, Loader=SafeLoader)
+        if not d:
+            continue
+        tasks.append(d)
+
+    try:
+        with open(TASKS_CACHE_PATH, "wb") as f:
+            pickle.dump((mtime_sig, tasks), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
     return tasks
 
+def read_json(path):
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def write_json(path, obj):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2, sort_keys=False)
+
 def load_results():
     if RESULTS_PATH.exists():
-        with open(RESULTS_PATH, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except Exception:
-                return []
+        try:
+            return read_json(RESULTS_PATH)
+        except Exception:
+            return []
     return []
 
 def save_results(records):
-    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(RESULTS_PATH, "w", encoding="utf-8") as f:
-        json.dump(records, f, indent=2, sort_keys=False)
-
-def run_cmd(cmd: str) -> str:
-    # Use shell so templates with pipes work; capture combined stdout/stderr
-    out = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    return out.stdout
-
-def upsert_result(all_results, rec):
-    for i, r in enumerate(all_results):
-        if r.get("id") == rec["id"]:
-            all_results[i] = rec
-            return
-    all_results.append(rec)
+    write_json(RESULTS_PATH, records)
+
+# Only the tail of a run's output is kept: the PERF block / Mean / Std lines come last
+OUTPUT_TAIL_BYTES = 64 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+# stderr is merged into stdout by run_cmd, so a trailing "2>&1" is redundant
+REDIRECT_SUFFIX = " 2>&1"
+SHELL_OPERATOR_CHARS = set("();<>|&")
+# Expansions, globs, comments, tilde, line continuations and multi-line scripts
+SHELL_ONLY_CHARS = "$`*?[]#~\\\n"
+
+def split_command(cmd: str):
+    """
+    argv for `cmd` when it can be exec'd directly, or None when /bin/sh might read
+    it differently: pipes, &&, redirects, expansions, globs, comments, line
+    continuations, multi-line scripts, VAR=value prefixes or shell builtins.
+    Anything doubtful goes to the shell; that is only one extra fork.
+    """
+    cmd = cmd.strip()
+    if cmd.endswith(REDIRECT_SUFFIX):
+        cmd = cmd[:-len(REDIRECT_SUFFIX)]
+    if any(c in cmd for c in SHELL_ONLY_CHARS):
+        return None
+    # Quoted text stays inside one token, so operator-only tokens are real shell syntax
+    lex = shlex.shlex(cmd, posix=True, punctuation_chars=True)
+    lex.whitespace_split = True
+    try:
+        if any(set(tok) <= SHELL_OPERATOR_CHARS for tok in lex):
+            return None
+        argv = shlex.split(cmd)
+    except ValueError:
+        return None
+    # "FOO=bar cmd" prefixes and builtins (cd, exit, export, ...) have no executable
+    if not argv or "=" in argv[0] or shutil.which(argv[0]) is None:
+        return None
+    return argv
+
+async def run_cmd(cmd: str) -> str:
+    # Exec directly when possible (no /bin/sh fork); capture combined stdout/stderr
+    argv = split_command(cmd)
+    if argv:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+            )
+        except OSError as e:
+            return str(e)
+    else:
+        proc = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+    tail = bytearray()
+    while True:
+        chunk = await proc.stdout.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        tail += chunk
+        if len(tail) > OUTPUT_TAIL_BYTES:
+            del tail[:-OUTPUT_TAIL_BYTES]
+    await proc.wait()
+    return tail.decode("utf-8", "replace")
+
+def utc_now_iso():
+    # e.g. 2025-08-12T01:23:45Z
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+def upsert_result(index, all_results, rec):
+    # index maps id -> position in all_results and is kept in sync here
+    i = index.get(rec["id"])
+    if i is None:
+        index[rec["id"]] = len(all_results)
+        all_results.append(rec)
+    else:
+        all_results[i] = rec
 
 def render(cmd_template: str, *, id, base_image=None, human_image=None, llm_image=None, workload_py=None):
     return cmd_template.format(
@@ -90,11 +337,295 @@ def render(cmd_template: str, *, id, base_image=None, human_image=None, llm_imag
         llm_image=llm_image or "",
     ).replace("<WORKLOAD_PY>", str(workload_py))
 
+# -------- Image prewarm --------
+# (task docker key, platform) of every image a task may run; human runs pin linux/amd64
+PULL_IMAGES = (("base_image", None), ("human_image", "linux/amd64"), ("llm_image", None))
+
+def _is_local(img):
+    try:
+        out = subprocess.run(["docker", "image", "inspect", img],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return False
+    return out.returncode == 0
+
+def _pull(item):
+    img, platform = item
+    argv = ["docker", "pull", "-q"] + (["--platform", platform] if platform else []) + [img]
+    try:
+        out = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError as e:
+        return img, str(e)
+    return img, None if out.returncode == 0 else out.stdout.strip()
+
+def prewarm_images(tasks, max_workers=4):
+    """
+    Pulls the images used by `tasks` that are missing locally, before any
+    measurement starts, so pull and layer extraction time never lands inside a
+    timed run. Local images are never re-pulled: a moved tag must not silently
+    change what is measured. Failures are reported but not fatal.
+    """
+    images = {}
+    for t in tasks:
+        docker = t.get("docker", {})
+        for key, platform in PULL_IMAGES:
+            img = docker.get(key)
+            if img and not str(img).upper().startswith("PLACEHOLDER"):
+                images.setdefault(img, platform)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        local = dict(zip(images, ex.map(_is_local, images)))
+        missing = {img: platform for img, platform in images.items() if not local[img]}
+        if not missing:
+            return
+        print(f"Pulling {len(missing)} missing images...")
+        for img, err in ex.map(_pull, missing.items()):
+            if err:
+                print(f"warning: pull failed for {img}: {err[-200:]}")
+
+# -------- Container pool --------
+# For pooled runs the container is started once with `sleep infinity` and the
+# workload is driven through `docker exec`. Per variant: (platform, one-time setup, run step).
+POOL_COMMANDS = {
+    "base":  (None, None, "python /tmp/workload.py"),
+    "human": ("linux/amd64", "chmod +x /perf.sh && git apply /tmp/patch.diff", "/perf.sh"),
+}
+POOL_MOUNT = "/bench"
+# The pooled commands above stand in for these templates only
+POOL_TEMPLATES = {"base": RUN_BASE, "human": RUN_HUMAN}
+
+def is_pool_template(variant, tmpl):
+    """True when `tmpl` is the stock template the pooled command replaces."""
+    if not tmpl or variant not in POOL_TEMPLATES:
+        return False
+    tmpl = tmpl.strip()
+    if tmpl.endswith(REDIRECT_SUFFIX):
+        tmpl = tmpl[:-len(REDIRECT_SUFFIX)]
+    return " ".join(tmpl.split()) == POOL_TEMPLATES[variant]
+
+async def _exec(argv):
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+    except OSError as e:
+        return 127, str(e)
+    out, _ = await proc.communicate()
+    return proc.returncode, out.decode("utf-8", "replace")
+
+class ContainerPool:
+    """
+    Keeps one long-lived container per (image, variant, workload dir) and hands
+    out its name for `docker exec`. Tasks sharing an image share the container,
+    so runs inside one container must hold its lock(). Containers are removed
+    at interpreter exit.
+    """
+    def __init__(self):
+        self._starting = {}
+        self._names = []
+        self._locks = {}
+        atexit.register(self.close)
+
+    def lock(self, name):
+        # /tmp/workload.py inside the container is per run; one exec at a time
+        return self._locks.setdefault(name, asyncio.Lock())
+
+    async def get(self, image, variant, mount_dir):
+        key = (image, variant, str(mount_dir))
+        if key not in self._starting:
+            self._starting[key] = asyncio.ensure_future(self._start(key))
+        return await self._starting[key]
+
+    async def _start(self, key):
+        """Returns (container name, None) or (None, error text)."""
+        image, variant, mount_dir = key
+        platform, setup, _ = POOL_COMMANDS[variant]
+        digest = hashlib.sha256("|".join(key).encode()).hexdigest()[:12]
+        name = f"bench_pool_{os.getpid()}_{digest}"
+
+        argv = ["docker", "run", "-d", "--rm", "--name", name]
+        if platform:
+            argv += ["--platform", platform]
+        argv += ["--mount", f"type=bind,src={mount_dir},dst={POOL_MOUNT}", image, "sleep", "infinity"]
+        rc, out = await _exec(argv)
+        if rc != 0:
+            return None, out.strip()
+        self._names.append(name)
+
+        if setup:
+            rc, out = await _exec(["docker", "exec", name, "/bin/bash", "-lc", setup])
+            if rc != 0:
+                return None, out.strip()
+        return name, None
+
+    def close(self):
+        if self._names:
+            subprocess.run(["docker", "rm", "-f", *self._names],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self._names = []
+
+# -------- Variant cache --------
+class VariantCache:
+    """
+    Parsed (mean, std) per (image digest, workload code, variant, command template),
+    persisted to VARIANT_CACHE_PATH after every new entry. Hits are only served
+    when `use_cached` is set (--mode resume).
+    """
+    def __init__(self, path, use_cached):
+        self.path = path
+        self.use_cached = use_cached
+        self._digests = {}
+        try:
+            self.entries = read_json(path)
+        except Exception:
+            self.entries = {}
+
+    async def image_digest(self, image):
+        if image not in self._digests:
+            self._digests[image] = asyncio.ensure_future(
+                _exec(["docker", "image", "inspect", "--format", "{{.Id}}", image])
+            )
+        rc, out = await self._digests[image]
+        return out.strip() if rc == 0 else None
+
+    async def key(self, image, workload_code, variant, cmd_template):
+        digest = await self.image_digest(image)
+        if not digest:
+            return None  # image not available locally; nothing stable to key on
+        h = hashlib.sha256()
+        for part in (digest, workload_code, variant, cmd_template):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key):
+        if not self.use_cached or not key:
+            return None
+        return self.entries.get(key)
+
+    def put(self, key, mean, std):
+        self.entries[key] = {
+            "mean": mean,
+            "std": std,
+            "ts": utc_now_iso(),
+        }
+        write_json(self.path, self.entries)
+
+# -------- Container stats --------
+MEM_UNITS = {
+    "b": 1, "kb": 1000, "mb": 1000**2, "gb": 1000**3, "tb": 1000**4,
+    "kib": 1024, "mib": 1024**2, "gib": 1024**3, "tib": 1024**4,
+}
+
+def parse_mem_mb(usage: str):
+    # "123.4MiB / 7.6GiB" -> 123.4 (MiB)
+    v = usage.split("/")[0].strip()
+    i = len(v.rstrip("BbIiKkMmGgTt"))
+    try:
+        return float(v[:i]) * MEM_UNITS[v[i:].lower()] / 1024**2
+    except (KeyError, ValueError):
+        return None
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def container_name(cmd: str):
+    """Value of --name in a rendered `docker run` command, if any."""
+    try:
+        argv = shlex.split(cmd)
+    except ValueError:
+        return None
+    for i, a in enumerate(argv):
+        if a == "--name" and i + 1 < len(argv):
+            return argv[i + 1]
+        if a.startswith("--name="):
+            return a.split("=", 1)[1]
+    return None
+
+class StatsCollector:
+    """
+    CPU / memory samples per (task id, variant), read from one long-lived
+    `docker stats` stream per container while its workload runs.
+    """
+    def __init__(self):
+        self.samples = {}
+
+    async def watch(self, key, name, coro):
+        """Awaits `coro` while streaming stats for container `name`."""
+        cpu, mem = self.samples.setdefault(key, ([], []))
+        done = asyncio.Event()
+        streamer = asyncio.ensure_future(self._stream(name, done, cpu, mem))
+        try:
+            return await coro
+        finally:
+            done.set()
+            await streamer
+
+    async def _stream(self, name, done, cpu, mem):
+        argv = ["docker", "stats", "--format", "{{json .}}", name]
+        waiter = asyncio.ensure_future(done.wait())
+        while not done.is_set():
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+                )
+            except OSError:
+                break
+            reader = asyncio.ensure_future(self._read(proc, cpu, mem))
+            await asyncio.wait({reader, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not reader.done():
+                proc.terminate()
+            await reader
+            await proc.wait()
+            if not done.is_set():
+                # container not created yet (or already gone); retry shortly
+                await asyncio.sleep(0.2)
+        waiter.cancel()
+
+    async def _read(self, proc, cpu, mem):
+        async for raw in proc.stdout:
+            line = raw.decode("utf-8", "replace")
+            start = line.find("{")  # lines may carry terminal clear codes
+            if start == -1:
+                continue
+            try:
+                d = json.loads(line[start:])
+                cpu.append(float(d["CPUPerc"].rstrip("%")))
+            except (ValueError, KeyError, AttributeError):
+                continue
+            m = parse_mem_mb(d.get("MemUsage", ""))
+            if m is not None:
+                mem.append(m)
+
+    def summary(self, id):
+        """rec["stats"] for task `id`: overall values plus a per-variant breakdown."""
+        variants = {}
+        for (tid, variant), (cpu, mem) in self.samples.items():
+            if tid == id:
+                variants[variant] = {
+                    "cpu_p95": percentile(cpu, 0.95),
+                    "mem_max_mb": max(mem) if mem else None,
+                }
+        cpu_vals = [v["cpu_p95"] for v in variants.values() if v["cpu_p95"] is not None]
+        mem_vals = [v["mem_max_mb"] for v in variants.values() if v["mem_max_mb"] is not None]
+        return {
+            "collect": True,
+            "cpu_p95": max(cpu_vals) if cpu_vals else None,
+            "mem_max_mb": max(mem_vals) if mem_vals else None,
+            "variants": variants,
+        }
+
 # -------- Core runner --------
-def run_variant(task, variant, workload_py):
+async def run_variant(task, variant, workload_py, pool=None, cache=None, stats=None):
     """
     Returns: (mean, std, info)
-      - info is a short string for logging ('OK', 'skipped (placeholder)', 'parse failed', etc.)
+      - info is a short string for logging ('OK', 'cached', 'skipped (placeholder)', 'parse failed', etc.)
+      - with a ContainerPool, base/human run via `docker exec` in a reused container
+      - with a VariantCache, successful parses are recorded and (in resume mode) reused
+      - with a StatsCollector, container CPU / memory is sampled during the run
     """
     docker = task.get("docker", {})
     id = task["id"]
@@ -108,50 +639,220 @@ def run_variant(task, variant, workload_py):
         tmpl = cmds.get("run_human")
         img  = docker.get("human_image")
         # Guard/fallback: enforce correct order = chmod -> git apply -> /perf.sh
-        desired = (
-            "docker run --rm --platform linux/amd64 --name bench_{id}_human "
-            "--mount type=bind,src=<WORKLOAD_PY>,dst=/tmp/workload.py "
-            "{human_image} /bin/bash -lc "
-            "'chmod +x /perf.sh && git apply /tmp/patch.diff && /perf.sh' 2>&1"
-        )
         if (not tmpl) or ("/perf.sh && git apply" in tmpl) or ("git apply -q" in tmpl):
-            tmpl = desired
+            tmpl = RUN_HUMAN
 
     elif variant == "llm":
+        # Placeholder llm images are filtered out by the caller (see run_tasks)
         tmpl = cmds.get("run_llm")
         img  = docker.get("llm_image")
-        if not img or str(img).upper().startswith("PLACEHOLDER"):
-            return None, None, "skipped (placeholder)"
     else:
         raise ValueError("unknown variant")
 
-    if not tmpl:
+    pooled = pool is not None and variant in POOL_COMMANDS
+    if pooled and not is_pool_template(variant, tmpl):
+        print(f"warning: {id} has a custom run_{variant} command; not using the container pool")
+        pooled = False
+    if pooled:
+        if not img:
+            return None, None, f"missing image for {variant}"
+        cmd_template = "pool: " + " && ".join(c for c in POOL_COMMANDS[variant][1:] if c)
+    elif not tmpl:
         return None, None, f"missing command template for {variant}"
-
-    cmd = render(
-        tmpl,
-        id=id,
-        base_image=docker.get("base_image"),
-        human_image=docker.get("human_image"),
-        llm_image=docker.get("llm_image"),
-        workload_py=workload_py,
-    )
-    text = run_cmd(cmd)
+    else:
+        cmd_template = tmpl
+
+    cache_key = None
+    if cache is not None and img:
+        workload_code = (task.get("workload") or {}).get("code", "")
+        cache_key = await cache.key(img, workload_code, variant, cmd_template)
+        hit = cache.get(cache_key)
+        if hit:
+            return hit["mean"], hit["std"], "cached"
+
+    if pooled:
+        name, err = await pool.get(img, variant, Path(workload_py).parent)
+        if name is None:
+            return None, None, f"pool start failed: {err[-200:]}"
+        script = f"cp {POOL_MOUNT}/{Path(workload_py).name} /tmp/workload.py && {POOL_COMMANDS[variant][2]}"
+        cmd = f"docker exec {name} /bin/bash -lc {shlex.quote(script)}"
+    else:
+        cmd = render(
+            tmpl,
+            id=id,
+            base_image=docker.get("base_image"),
+            human_image=docker.get("human_image"),
+            llm_image=docker.get("llm_image"),
+            workload_py=workload_py,
+        )
+    stats_name = None
+    if stats is not None:
+        stats_name = name if pooled else container_name(cmd)
+
+    async def execute():
+        if stats_name:
+            return await stats.watch((id, variant), stats_name, run_cmd(cmd))
+        return await run_cmd(cmd)
+
+    if pooled:
+        async with pool.lock(name):
+            text = await execute()
+    else:
+        text = await execute()
     mean, std = parse_mean_std(text)
     if mean is None or std is None:
         return None, None, "parse failed"
+    if cache_key:
+        cache.put(cache_key, mean, std)
     return mean, std, "OK"
 
 def p(v):
     # print-friendly (no forced rounding)
     return "—" if v is None else str(v)
 
+def safe_div(a, b):
+    """a / b, or None when either side is missing or b is zero."""
+    if a is None or b is None or b == 0:
+        return None
+    return a / b
+
+# Every results.json record has these keys, in this order
+_REC_SKEL = {
+    "id": None,
+    "before": None,
+    "after_human": None,
+    "after_llm": None,
+    "status": None,
+    "comparison": None,
+    "stats": None,
+    "updated_at": None,
+    "human_improvement": None,
+    "LLM_improvement": None,
+    "speedup_human": None,
+    "speedup_llm": None,
+}
+
+def build_record(t, before, human, llm, now_iso, stats=None, llm_placeholder=False):
+    before_mean, before_std = before
+    human_mean, human_std = human
+    llm_mean, llm_std = llm
+
+    rec = {
+        **_REC_SKEL,
+        "id": t["id"],
+        "status": t.get("status", {}),
+        "comparison": t.get("comparison", {}),
+        "stats": stats or {"collect": False, "cpu_p95": None, "mem_max_mb": None},
+        "updated_at": now_iso,
+    }
+    if before_mean is not None:
+        rec["before"] = {"mean": before_mean, "std": before_std}
+    if human_mean is not None:
+        rec["after_human"] = {"mean": human_mean, "std": human_std}
+    if llm_mean is not None:
+        rec["after_llm"] = {"mean": llm_mean, "std": llm_std}
+
+    # ---- Improvements (%), negative = faster (better) ----
+    human_ratio = safe_div(human_mean, before_mean)
+    llm_ratio = safe_div(llm_mean, before_mean)
+    rec["human_improvement"] = None if human_ratio is None else (human_ratio - 1) * 100.0
+    rec["LLM_improvement"] = None if llm_ratio is None else (llm_ratio - 1) * 100.0
+
+    # (Backward-compat fields; safe to remove later if not needed)
+    rec["speedup_human"] = safe_div(before_mean, human_mean) if before_mean else None
+    rec["speedup_llm"] = safe_div(before_mean, llm_mean) if before_mean else None
+
+    # LLM better?
+    if human_mean is not None and llm_mean is not None:
+        eps = 1e-9
+        if llm_mean + eps < human_mean:
+            rec["comparison"]["llm_better"] = "YES"
+        elif human_mean + eps < llm_mean:
+            rec["comparison"]["llm_better"] = "NO"
+        else:
+            rec["comparison"]["llm_better"] = "TIE"
+    elif llm_placeholder or rec["status"].get("llm","").upper() in ["COMING_SOON","PENDING"]:
+        rec["comparison"]["llm_better"] = "COMING_SOON"
+    else:
+        rec["comparison"].setdefault("llm_better","UNKNOWN")
+
+    return rec
+
+async def run_tasks(tasks, now_iso, jobs, pool=None, cache=None, stats=None,
+                    parallel_variants=False):
+    """
+    Runs all tasks with at most `jobs` tasks in flight; a task's variants run one
+    after another unless `parallel_variants` is set. Anything concurrent competes
+    for CPU / memory with the runs being timed, so both default to sequential.
+    Returns one record (or None when skipped) per task, in input order.
+    """
+    sem = asyncio.Semaphore(max(1, jobs))
+
+    # One temp dir for the whole run; identical workloads share a single file
+    with tempfile.TemporaryDirectory(prefix="bench_") as td, Progress() as progress:
+        task_prog = progress.add_task("[cyan]Running tasks...", total=len(tasks))
+        workloads = {}  # sha256(code) -> workload file
+
+        def workload_file(code):
+            key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+            wpy = workloads.get(key)
+            if wpy is None:
+                wpy = Path(td) / f"workload_{key[:16]}.py"
+                wpy.write_text(code, encoding="utf-8")
+                workloads[key] = wpy
+            return wpy
+
+        async def process(t):
+            id = t["id"]
+            workload_code = (t.get("workload") or {}).get("code", "")
+            if not workload_code.strip():
+                progress.console.print(f"[yellow]{id}[/yellow] has empty workload.code; skipping")
+                progress.advance(task_prog)
+                return None
+
+            # Decided once per task: most tasks have no llm image yet
+            llm_image = str(t.get("docker", {}).get("llm_image") or "")
+            llm_placeholder = llm_image.upper().startswith("PLACEHOLDER")
+            skip_llm = llm_placeholder or not llm_image
+
+            wpy = workload_file(workload_code)
+            variants = ["base", "human"] + ([] if skip_llm else ["llm"])
+            async with sem:
+                if parallel_variants:
+                    runs = await asyncio.gather(
+                        *[run_variant(t, v, wpy, pool, cache, stats) for v in variants]
+                    )
+                else:
+                    runs = [await run_variant(t, v, wpy, pool, cache, stats) for v in variants]
+            base, human = runs[0], runs[1]
+            llm = (None, None, "skipped (placeholder)") if skip_llm else runs[2]
+
+            for name, (m, s, info) in (("base ", base), ("human", human), ("llm  ", llm)):
+                progress.console.print(f"{escape(f'[{id}]')} {name} : mean={p(m)} std={p(s)} ({info})")
+            progress.advance(task_prog)
+            return build_record(t, base[:2], human[:2], llm[:2], now_iso,
+                                stats.summary(id) if stats is not None else None,
+                                llm_placeholder=llm_placeholder)
+
+        return await asyncio.gather(*[process(t) for t in tasks])
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--only", nargs="*", help="Run only these task ids")
     ap.add_argument("--collect-stats", action="store_true",
-                    help="(placeholder) collect docker stats [not implemented in MVP]")
-    ap.add_argument("--mode", choices=["quick","resume"], default="quick")
+                    help="Record container CPU p95 / max memory (docker stats) per variant")
+    ap.add_argument("--mode", choices=["quick","resume"], default="quick",
+                    help="resume: reuse cached results for unchanged (image, workload, variant)")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Max number of tasks run concurrently (default: 1). "
+                         "Values > 1 make runs compete for CPU/memory and add measurement noise")
+    ap.add_argument("--parallel-variants", action="store_true",
+                    help="Run a task's base/human/llm variants concurrently. "
+                         "Faster, but the variants skew each other's timings")
+    ap.add_argument("--reuse-containers", action="store_true",
+                    help="Keep one container per image alive and run workloads via docker exec")
+    ap.add_argument("--no-pull", action="store_true",
+                    help="Skip pulling missing task images before the benchmark loop")
     args = ap.parse_args()
 
     tasks = load_tasks()
@@ -163,108 +864,25 @@ def main():
         return
 
     results = load_results()
-    now_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-
-    with Progress() as progress:
-        task_prog = progress.add_task("[cyan]Running tasks...", total=len(tasks))
-        for t in tasks:
-            id = t["id"]
-            workload_code = (t.get("workload") or {}).get("code", "")
-            if not workload_code.strip():
-                progress.console.print(f"[yellow]{id}[/yellow] has empty workload.code; skipping")
-                progress.advance(task_prog)
-                continue
-
-            # Prepare workload.py in a temp dir
-            with tempfile.TemporaryDirectory() as td:
-                wpy = Path(td) / "workload.py"
-                wpy.write_text(workload_code, encoding="utf-8")
-
-                before_mean = before_std = None
-                human_mean = human_std = None
-                llm_mean = llm_std = None
-
-                # Base
-                m, s, info = run_variant(t, "base", wpy)
-                before_mean, before_std = m, s
-                progress.console.print(f"[{id}] base  : mean={p(m)} std={p(s)} ({info})")
-
-                # Human
-                m, s, info = run_variant(t, "human", wpy)
-                human_mean, human_std = m, s
-                progress.console.print(f"[{id}] human : mean={p(m)} std={p(s)} ({info})")
-
-                # LLM
-                m, s, info = run_variant(t, "llm", wpy)
-                llm_mean, llm_std = m, s
-                progress.console.print(f"[{id}] llm   : mean={p(m)} std={p(s)} ({info})")
-
-                rec = {
-                    "id": id,
-                    "before": {"mean": before_mean, "std": before_std} if before_mean is not None else None,
-                    "after_human": {"mean": human_mean, "std": human_std} if human_mean is not None else None,
-                    "after_llm": {"mean": llm_mean, "std": llm_std} if llm_mean is not None else None,
-                    "status": t.get("status", {}),
-                    "comparison": t.get("comparison", {}),
-                    "stats": {"collect": False, "cpu_p95": None, "mem_max_mb": None},
-                    "updated_at": now_iso
-                }
-
-                # ---- Improvements (%), negative = faster (better) ----
-                def calc_impr(after_mean, before_mean):
-                    try:
-                        if after_mean is None or before_mean is None or before_mean == 0:
-                            return None
-                        return (after_mean / before_mean - 1) * 100.0
-                    except Exception:
-                        return None
-
-                rec["human_improvement"] = calc_impr(
-                    rec["after_human"]["mean"] if rec["after_human"] else None,
-                    rec["before"]["mean"] if rec["before"] else None
-                )
-                rec["LLM_improvement"] = calc_impr(
-                    rec["after_llm"]["mean"] if rec["after_llm"] else None,
-                    rec["before"]["mean"] if rec["before"] else None
-                )
-
-                # (Backward-compat fields; safe to remove later if not needed)
-                rec["speedup_human"] = (
-                    rec["before"]["mean"] / rec["after_human"]["mean"]
-                    if rec.get("before") and rec.get("after_human") and
-                       rec["before"]["mean"] and rec["after_human"]["mean"] else None
-                )
-                rec["speedup_llm"] = (
-                    rec["before"]["mean"] / rec["after_llm"]["mean"]
-                    if rec.get("before") and rec.get("after_llm") and
-                       rec["before"]["mean"] and rec["after_llm"]["mean"] else None
-                )
-
-                # LLM better?
-                if rec["after_human"] and rec["after_llm"] and \
-                   rec["after_human"]["mean"] is not None and rec["after_llm"]["mean"] is not None:
-                    hm = rec["after_human"]["mean"]
-                    lm = rec["after_llm"]["mean"]
-                    eps = 1e-9
-                    if lm + eps < hm:
-                        rec["comparison"]["llm_better"] = "YES"
-                    elif hm + eps < lm:
-                        rec["comparison"]["llm_better"] = "NO"
-                    else:
-                        rec["comparison"]["llm_better"] = "TIE"
-                elif rec["status"].get("llm","").upper() in ["COMING_SOON","PENDING"] or \
-                     str(t.get("docker",{}).get("llm_image","")).upper().startswith("PLACEHOLDER"):
-                    rec["comparison"]["llm_better"] = "COMING_SOON"
-                else:
-                    rec["comparison"].setdefault("llm_better","UNKNOWN")
-
-                upsert_result(results, rec)
-
-            progress.advance(task_prog)
+    now_iso = utc_now_iso()
+
+    if not args.no_pull:
+        prewarm_images(tasks)
+
+    pool = ContainerPool() if args.reuse_containers else None
+    cache = VariantCache(VARIANT_CACHE_PATH, use_cached=args.mode == "resume")
+    stats = StatsCollector() if args.collect_stats else None
+    # id -> position; like the old linear scan, the first record wins on duplicate ids
+    results_idx = {}
+    for i, r in enumerate(results):
+        results_idx.setdefault(r.get("id"), i)
+    for rec in asyncio.run(run_tasks(tasks, now_iso, args.jobs, pool, cache, stats,
+                                     parallel_variants=args.parallel_variants)):
+        if rec is not None:
+            upsert_result(results_idx, results, rec)
 
     save_results(results)
     print(f"Done. Wrote {RESULTS_PATH}")
 
 if __name__ == "__main__":
     main()
-
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
-import argparse, csv
+import argparse, csv, os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import yaml
 
+from _bench_common import RUN_BASE, RUN_HUMAN, RUN_LLM, SafeDumper
+
+def write_yaml(path, y):
+    with open(path, "w", encoding="utf-8") as wf:
+        yaml.dump(y, wf, Dumper=SafeDumper, sort_keys=False, allow_unicode=True)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--csv", required=True)
@@ -12,6 +19,8 @@ def main():
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    # iid -> task; a later row with the same instance_id replaces an earlier one
+    docs = {}
     with open(args.csv, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -43,9 +52,9 @@ def main():
                     "human_image": row.get("annotate_dockerhub_image") or "",
                     "llm_image": "PLACEHOLDER",
                     "commands": {
-                        "run_base": "docker run --rm --name bench_{id}_base --mount type=bind,src=<WORKLOAD_PY>,dst=/tmp/workload.py {base_image} /bin/bash -lc 'python /tmp/workload.py' 2>&1",
-                        "run_human": "docker run --rm --platform linux/amd64 --name bench_{id}_human --mount type=bind,src=<WORKLOAD_PY>,dst=/tmp/workload.py {human_image} /bin/bash -lc 'chmod +x /perf.sh && git apply /tmp/patch.diff && /perf.sh' 2>&1",
-                        "run_llm": "echo 'LLM image not available yet for {id}. Please fill docker.llm_image.'"
+                        "run_base": RUN_BASE,
+                        "run_human": RUN_HUMAN,
+                        "run_llm": RUN_LLM
                     }
                 },
                 "metrics": {
@@ -64,8 +73,13 @@ def main():
                 }
             }
 
-            with open(out_dir / f"{iid}.yml", "w", encoding="utf-8") as wf:
-                yaml.safe_dump(y, wf, sort_keys=False, allow_unicode=True)
+            docs[iid] = y
+
+    # Each task file is independent (and written once), so the writes go through a thread pool
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = [pool.submit(write_yaml, out_dir / f"{iid}.yml", y) for iid, y in docs.items()]
+        for fut in futures:
+            fut.result()  # surface write errors
 
     print(f"Wrote YAML files to {out_dir}")
 
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Mirror docs/_data/tasks/*.yml as JSON so bench.py can load tasks with the C
+json parser. The YAML files stay the source of truth; re-run after editing them
+(stale or missing JSON files are simply ignored by bench.py).
+"""
+import argparse, json
+from pathlib import Path
+import yaml
+
+from _bench_common import TASKS_DIR, TASKS_JSON_DIR, SafeLoader
+
+def convert(yml_path: Path, json_path: Path):
+    with open(yml_path, "r", encoding="utf-8") as f:
+        d = yaml.load(f, Loader=SafeLoader)
+    # Serialize first so a non-JSON value never leaves a partial file behind
+    text = json.dumps(d, ensure_ascii=False)
+    # json.dumps quietly stringifies non-string keys ({1: "a"} -> {"1": "a"})
+    if json.loads(text) != d:
+        raise ValueError("does not round-trip through JSON")
+    with open(json_path, "w", encoding="utf-8") as wf:
+        wf.write(text)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tasks", default=str(TASKS_DIR), help="Directory with task YAML files")
+    ap.add_argument("--out", default=str(TASKS_JSON_DIR), help="Directory to write JSON files")
+    ap.add_argument("--force", action="store_true", help="Rewrite JSON files that are up to date")
+    args = ap.parse_args()
+
+    tasks_dir, out_dir = Path(args.tasks), Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    for p in sorted(tasks_dir.glob("*.yml")):
+        jp = out_dir / f"{p.stem}.json"
+        if not args.force and jp.exists() and jp.stat().st_mtime_ns >= p.stat().st_mtime_ns:
+            continue
+        try:
+            convert(p, jp)
+        except (TypeError, ValueError) as e:
+            # e.g. an unquoted date or a non-string key; bench.py reads the YAML instead
+            print(f"skip {p.name}: not representable as JSON ({e})")
+            continue
+        written += 1
+
+    print(f"Wrote {written} JSON files to {out_dir}")
+
+if __name__ == "__main__":
+    main()